@@ -6,8 +6,10 @@ Playwright-based browser automation for testing web applications.
 
 import asyncio
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
 from enum import Enum
 
 
@@ -30,6 +32,42 @@ class BrowserConfig:
     user_agent: Optional[str] = None
     storage_state: Optional[str] = None  # Path to auth state
     proxy: Optional[Dict[str, str]] = None
+    
+    @cached_property
+    def launch_options(self) -> Mapping[str, Any]:
+        """Browser launch options (computed once per config)."""
+        options: Dict[str, Any] = {
+            "headless": self.headless,
+            "slow_mo": self.slow_mo,
+        }
+        
+        if self.proxy:
+            options["proxy"] = self.proxy
+        
+        return MappingProxyType(options)
+    
+    @cached_property
+    def context_options(self) -> Mapping[str, Any]:
+        """Browser context options (computed once per config)."""
+        options: Dict[str, Any] = {
+            "viewport": {
+                "width": self.viewport_width,
+                "height": self.viewport_height,
+            }
+        }
+        
+        if self.user_agent:
+            options["user_agent"] = self.user_agent
+        
+        return MappingProxyType(options)
+
+
+# Playwright attribute holding the launcher for each browser type
+_LAUNCHER_BY_TYPE = {
+    BrowserType.CHROMIUM: "chromium",
+    BrowserType.FIREFOX: "firefox",
+    BrowserType.WEBKIT: "webkit",
+}
 
 
 @dataclass
@@ -71,6 +109,7 @@ class BrowserManager:
         self._browser = None
         self._context = None
         self._page = None
+        self._owns_context = True
     
     async def start(self):
         """Start browser instance."""
@@ -82,34 +121,13 @@ class BrowserManager:
         self._playwright = await async_playwright().start()
         
         # Get browser launcher
-        if self.config.browser_type == BrowserType.CHROMIUM:
-            launcher = self._playwright.chromium
-        elif self.config.browser_type == BrowserType.FIREFOX:
-            launcher = self._playwright.firefox
-        else:
-            launcher = self._playwright.webkit
+        launcher = getattr(self._playwright, _LAUNCHER_BY_TYPE[self.config.browser_type])
         
         # Launch browser
-        launch_options = {
-            "headless": self.config.headless,
-            "slow_mo": self.config.slow_mo,
-        }
-        
-        if self.config.proxy:
-            launch_options["proxy"] = self.config.proxy
-        
-        self._browser = await launcher.launch(**launch_options)
+        self._browser = await launcher.launch(**self.config.launch_options)
         
         # Create context
-        context_options = {
-            "viewport": {
-                "width": self.config.viewport_width,
-                "height": self.config.viewport_height,
-            }
-        }
-        
-        if self.config.user_agent:
-            context_options["user_agent"] = self.config.user_agent
+        context_options = dict(self.config.context_options)
         
         if self.config.storage_state and Path(self.config.storage_state).exists():
             context_options["storage_state"] = self.config.storage_state
@@ -120,8 +138,25 @@ class BrowserManager:
         # Set default timeout
         self._page.set_default_timeout(self.config.timeout)
     
+    async def new_tab(self) -> "BrowserManager":
+        """Open another page in this browser context as its own manager."""
+        tab = BrowserManager(self.config)
+        tab._context = self._context
+        tab._owns_context = False
+        tab._page = await self._context.new_page()
+        tab._page.set_default_timeout(self.config.timeout)
+        return tab
+    
     async def stop(self):
         """Stop browser instance."""
+        if not self._owns_context:
+            # Tab opened with new_tab(): close only its page
+            if self._page:
+                await self._page.close()
+            self._page = None
+            self._context = None
+            return
+        
         if self._context:
             await self._context.close()
         if self._browser:
@@ -271,6 +306,10 @@ class BrowserManager:
                 error=str(e)
             )
     
+    async def screenshot_bytes(self, full_page: bool = False) -> bytes:
+        """Take a screenshot and return the PNG data without writing it."""
+        return await self._page.screenshot(full_page=full_page)
+    
     async def evaluate(self, script: str) -> ActionResult:
         """Execute JavaScript in the page."""
         try:
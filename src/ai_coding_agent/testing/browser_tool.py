@@ -12,6 +12,11 @@ from ..tools.registry import tool, ToolCategory, ToolParameter, ToolResult
 from .workflow_runner import TestWorkflowRunner, TestWorkflow
 
 
+def _looks_like_inline_yaml(text: str) -> bool:
+    """Check whether text is YAML content rather than a file path."""
+    return "\n" in text or text.lstrip().startswith(("---", "- ", "{", "steps:", "name:"))
+
+
 @tool(
     name="run_browser_test",
     description="Run a browser test workflow to test web application functionality. Captures network traffic and screenshots.",
@@ -43,19 +48,24 @@ async def run_browser_test(
     base_url: Optional[str] = None,
     variables: Optional[dict] = None,
 ) -> ToolResult:
-    """Run a browser test workflow."""
+    """
+    Run a browser test workflow.
+    
+    YAML is parsed with libyaml when PyYAML was built against it
+    (install libyaml before PyYAML); otherwise the pure-Python loader is used.
+    """
     try:
         runner = TestWorkflowRunner()
         
-        path = Path(workflow_path)
-        if path.exists():
-            # Load from file
-            workflow = TestWorkflow.from_yaml(path)
+        if _looks_like_inline_yaml(workflow_path):
+            workflow = TestWorkflow.from_yaml_text(workflow_path)
         else:
-            # Try parsing as inline YAML
-            import yaml
-            data = yaml.safe_load(workflow_path)
-            workflow = TestWorkflow.from_dict(data)
+            try:
+                # Load from file
+                workflow = TestWorkflow.from_yaml(Path(workflow_path))
+            except FileNotFoundError:
+                # Try parsing as inline YAML
+                workflow = TestWorkflow.from_yaml_text(workflow_path)
         
         # Override base_url if provided
         if base_url:
@@ -133,17 +143,29 @@ async def run_browser_test(
             description="URL pattern to filter (only capture matching requests)",
             required=False,
         ),
+        ToolParameter(
+            name="block_static",
+            type="boolean",
+            description="Block images, fonts, media and stylesheets to capture API traffic only",
+            required=False,
+            default=False,
+        ),
     ],
 )
 async def capture_network(
     url: str,
     wait_seconds: int = 5,
     filter_pattern: Optional[str] = None,
+    block_static: bool = False,
 ) -> ToolResult:
     """Capture network traffic from a URL."""
     try:
         from .browser import BrowserManager
-        from .network_inspector import CDPNetworkInspector, create_url_filter
+        from .network_inspector import (
+            CDPNetworkInspector,
+            DEFAULT_BLOCKED_TYPES,
+            create_url_filter,
+        )
         
         browser = BrowserManager()
         await browser.start()
@@ -154,17 +176,22 @@ async def capture_network(
             if filter_pattern:
                 url_filter = create_url_filter(include_patterns=[filter_pattern])
             
-            inspector = CDPNetworkInspector(browser.page, url_filter=url_filter)
+            inspector = CDPNetworkInspector(
+                browser.page,
+                url_filter=url_filter,
+                block_types=DEFAULT_BLOCKED_TYPES if block_static else None,
+            )
             await inspector.start()
             
-            # Navigate
-            await browser.navigate(url)
-            
-            # Wait for network activity
-            await asyncio.sleep(wait_seconds)
-            
-            # Stop capture
-            log = await inspector.stop()
+            try:
+                # Navigate
+                await browser.navigate(url)
+                
+                # Wait for network activity
+                await asyncio.sleep(wait_seconds)
+            finally:
+                # Stop capture (also releases the page if navigation failed)
+                log = await inspector.stop()
             
             # Format output
             output_lines = [
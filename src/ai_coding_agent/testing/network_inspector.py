@@ -6,9 +6,12 @@ Chrome DevTools Protocol network traffic capture and analysis.
 
 import asyncio
 import json
+import operator
+import re
+import weakref
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from enum import Enum
 
 
@@ -26,7 +29,26 @@ class ResourceType(Enum):
     OTHER = "Other"
 
 
-@dataclass
+# Content types whose bodies are never stored, so skip fetching them
+_BINARY_RE = re.compile(r"^(?:image|font|video|audio)/|/octet-stream", re.IGNORECASE)
+
+# Playwright resource types that are never API traffic
+DEFAULT_BLOCKED_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+# CDP sessions (with the Network domain enabled) reused across captures, per page
+_CDP_SESSIONS: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+# Inspector currently capturing on each page. Values are weak references:
+# the inspector holds its page, so a strong value would keep the key alive
+_ACTIVE_INSPECTORS: "weakref.WeakKeyDictionary[Any, weakref.ref[CDPNetworkInspector]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Maximum response body length included in exported request dicts
+_MAX_EXPORTED_BODY = 1000
+
+
+@dataclass(slots=True)
 class NetworkRequest:
     """Captured network request."""
     request_id: str
@@ -48,24 +70,68 @@ class NetworkRequest:
     # Error info
     error: Optional[str] = None
     
+    # Set when the response content type is binary (body is not fetched)
+    skip_body: bool = field(default=False, repr=False)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
-        return {
-            "request_id": self.request_id,
-            "url": self.url,
-            "method": self.method,
-            "resource_type": self.resource_type,
-            "headers": self.headers,
-            "post_data": self.post_data,
-            "timestamp": self.timestamp,
-            "status": self.status,
-            "status_text": self.status_text,
-            "response_headers": self.response_headers,
-            "response_body": self.response_body[:1000] if self.response_body else None,
-            "response_size": self.response_size,
-            "response_time_ms": self.response_time_ms,
-            "error": self.error,
-        }
+        data = dict(zip(_EXPORT_KEYS, _get_export_values(self)))
+        data["response_body"] = (
+            self.response_body[:_MAX_EXPORTED_BODY] if self.response_body else None
+        )
+        return data
+
+
+# Fields exported by NetworkRequest.to_dict, in output order
+_EXPORT_KEYS = (
+    "request_id",
+    "url",
+    "method",
+    "resource_type",
+    "headers",
+    "post_data",
+    "timestamp",
+    "status",
+    "status_text",
+    "response_headers",
+    "response_body",
+    "response_size",
+    "response_time_ms",
+    "error",
+)
+_get_export_values = operator.attrgetter(*_EXPORT_KEYS)
+
+# Shared placeholder for response headers; replaced (never mutated) on response
+_NO_HEADERS: Dict[str, str] = {}
+
+
+def _new_request(
+    request_id: str,
+    url: str,
+    method: str,
+    resource_type: str,
+    headers: Dict[str, str],
+    post_data: Optional[str],
+    timestamp: str,
+) -> NetworkRequest:
+    """Build a NetworkRequest without the dataclass __init__ overhead."""
+    req = object.__new__(NetworkRequest)
+    req.request_id = request_id
+    req.url = url
+    req.method = method
+    req.resource_type = resource_type
+    req.headers = headers
+    req.post_data = post_data
+    req.timestamp = timestamp
+    req.status = None
+    req.status_text = None
+    req.response_headers = _NO_HEADERS
+    req.response_body = None
+    req.response_size = 0
+    req.response_time_ms = 0
+    req.error = None
+    req.skip_body = False
+    return req
 
 
 @dataclass
@@ -112,6 +178,9 @@ class CDPNetworkInspector:
     - Request bodies
     - Response bodies
     - Timing information
+    
+    Resource types listed in ``block_types`` (Playwright names such as
+    "image" or "font") are aborted before they reach the network.
     """
     
     def __init__(
@@ -120,11 +189,13 @@ class CDPNetworkInspector:
         url_filter: Optional[Callable[[str], bool]] = None,
         capture_body: bool = True,
         max_body_size: int = 100000,  # 100KB
+        block_types: Optional[Iterable[str]] = None,
     ):
         self.page = page
         self.url_filter = url_filter
         self.capture_body = capture_body
         self.max_body_size = max_body_size
+        self.block_types = frozenset(block_types or ())
         
         self._client = None
         self._requests: Dict[str, NetworkRequest] = {}
@@ -133,17 +204,30 @@ class CDPNetworkInspector:
     
     async def start(self):
         """Start capturing network traffic."""
-        # Get CDP session
-        self._client = await self.page.context.new_cdp_session(self.page)
+        if self._is_capturing:
+            return
+        
+        active = _active_inspector(self.page)
+        if active is not None and active is not self:
+            raise RuntimeError("Network capture is already active on this page")
         
-        # Enable network domain
-        await self._client.send("Network.enable")
+        # Claim the page before awaiting so a concurrent start() sees it
+        _ACTIVE_INSPECTORS[self.page] = weakref.ref(self)
+        
+        # Get the page's shared CDP session
+        try:
+            self._client = await _get_cdp_session(self.page)
+        except BaseException:
+            self._release_page()
+            raise
         
         # Set up event handlers
-        self._client.on("Network.requestWillBeSent", self._on_request)
-        self._client.on("Network.responseReceived", self._on_response)
-        self._client.on("Network.loadingFinished", self._on_loading_finished)
-        self._client.on("Network.loadingFailed", self._on_loading_failed)
+        for event, handler in self._event_handlers():
+            self._client.on(event, handler)
+        
+        # Abort blocked resource types in the browser
+        if self.block_types:
+            await self.page.route("**/*", self._on_route)
         
         self._log.start_time = datetime.now().isoformat()
         self._is_capturing = True
@@ -154,14 +238,45 @@ class CDPNetworkInspector:
         self._log.end_time = datetime.now().isoformat()
         self._log.requests = list(self._requests.values())
         
-        if self._client:
+        if self.block_types:
             try:
-                await self._client.send("Network.disable")
+                await self.page.unroute("**/*", self._on_route)
             except Exception:
                 pass
         
+        # Detach handlers but keep the session and Network domain alive
+        if self._client:
+            for event, handler in self._event_handlers():
+                try:
+                    self._client.remove_listener(event, handler)
+                except Exception:
+                    pass
+        
+        self._release_page()
+        
         return self._log
     
+    def _release_page(self):
+        """Drop this inspector's claim on its page, if it holds one."""
+        if _active_inspector(self.page) is self:
+            del _ACTIVE_INSPECTORS[self.page]
+    
+    def _event_handlers(self):
+        """CDP events and their handlers."""
+        return (
+            ("Network.requestWillBeSent", self._on_request),
+            ("Network.responseReceived", self._on_response),
+            ("Network.loadingFinished", self._on_loading_finished),
+            ("Network.loadingFailed", self._on_loading_failed),
+        )
+    
+    async def _on_route(self, route):
+        """Abort requests for blocked resource types."""
+        if route.request.resource_type in self.block_types:
+            await route.abort()
+        else:
+            await route.continue_()
+    
     def _on_request(self, event: Dict[str, Any]):
         """Handle request event."""
         if not self._is_capturing:
@@ -170,19 +285,25 @@ class CDPNetworkInspector:
         request_id = event.get("requestId", "")
         request_data = event.get("request", {})
         url = request_data.get("url", "")
+        resource_type = event.get("type", "Other")
+        
+        # Requests aborted by _on_route are not traffic; skip them so their
+        # loadingFailed events don't show up as errors
+        if self.block_types and resource_type.lower() in self.block_types:
+            return
         
         # Apply URL filter
         if self.url_filter and not self.url_filter(url):
             return
         
-        self._requests[request_id] = NetworkRequest(
-            request_id=request_id,
-            url=url,
-            method=request_data.get("method", "GET"),
-            resource_type=event.get("type", "Other"),
-            headers=request_data.get("headers", {}),
-            post_data=request_data.get("postData"),
-            timestamp=datetime.now().isoformat(),
+        self._requests[request_id] = _new_request(
+            request_id,
+            url,
+            request_data.get("method", "GET"),
+            resource_type,
+            request_data.get("headers", {}),
+            request_data.get("postData"),
+            datetime.now().isoformat(),
         )
     
     def _on_response(self, event: Dict[str, Any]):
@@ -200,6 +321,11 @@ class CDPNetworkInspector:
         req.status = response.get("status")
         req.status_text = response.get("statusText")
         req.response_headers = response.get("headers", {})
+        
+        content_type = response.get("mimeType") or _get_header(
+            req.response_headers, "content-type"
+        )
+        req.skip_body = bool(_BINARY_RE.search(content_type))
     
     def _on_loading_finished(self, event: Dict[str, Any]):
         """Handle loading finished event."""
@@ -214,7 +340,11 @@ class CDPNetworkInspector:
         req.response_size = event.get("encodedDataLength", 0)
         
         # Capture response body if enabled
-        if self.capture_body and req.response_size <= self.max_body_size:
+        if (
+            self.capture_body
+            and not req.skip_body
+            and req.response_size <= self.max_body_size
+        ):
             asyncio.create_task(self._capture_body(request_id))
     
     def _on_loading_failed(self, event: Dict[str, Any]):
@@ -265,11 +395,38 @@ class CDPNetworkInspector:
         ]
     
     def clear(self):
-        """Clear captured requests."""
-        self._requests.clear()
+        """Clear captured requests by dropping the buffers (O(1), no in-place deletes)."""
+        self._requests = {}
         self._log = NetworkLog()
 
 
+def _active_inspector(page) -> Optional[CDPNetworkInspector]:
+    """Get the inspector currently capturing on a page, if it is still alive."""
+    ref = _ACTIVE_INSPECTORS.get(page)
+    return ref() if ref is not None else None
+
+
+async def _get_cdp_session(page):
+    """Get the page's CDP session, creating it and enabling Network once."""
+    client = _CDP_SESSIONS.get(page)
+    if client is None:
+        client = await page.context.new_cdp_session(page)
+        await client.send("Network.enable")
+        _CDP_SESSIONS[page] = client
+    return client
+
+
+def _get_header(headers: Dict[str, str], name: str) -> str:
+    """Get a header value by case-insensitive name."""
+    value = headers.get(name)
+    if value is not None:
+        return value
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return ""
+
+
 def create_url_filter(
     include_patterns: Optional[List[str]] = None,
     exclude_patterns: Optional[List[str]] = None,
@@ -4,16 +4,32 @@ Test Workflow Runner
 Execute browser test workflows from YAML configuration.
 """
 
+import asyncio
+import re
 import yaml
-from dataclasses import dataclass, field
+from collections import ChainMap, OrderedDict
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
 
 from .browser import BrowserManager, BrowserConfig, PageAction, ActionResult
 from .network_inspector import CDPNetworkInspector, NetworkLog, create_url_filter
 
+try:
+    # libyaml-backed loader, much faster than the pure-Python one
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-@dataclass
+# Parsed workflows keyed by (resolved path, mtime_ns, size), in LRU order
+_WORKFLOW_CACHE: "OrderedDict[Tuple[str, int, int], TestWorkflow]" = OrderedDict()
+_WORKFLOW_CACHE_SIZE = 128
+
+# Characters not allowed in screenshot file names
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w.-]+")
+
+
+@dataclass(frozen=True, slots=True)
 class TestStep:
     """Single step in a test workflow."""
     name: str
@@ -25,6 +41,7 @@ class TestStep:
     capture_network: bool = False
     assert_condition: Optional[str] = None
     assert_value: Optional[str] = None
+    group: Optional[str] = None  # Consecutive steps in a group run concurrently
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "TestStep":
@@ -38,10 +55,11 @@ class TestStep:
             capture_network=data.get("capture_network", False),
             assert_condition=data.get("assert"),
             assert_value=data.get("expected"),
+            group=data.get("group"),
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class TestWorkflow:
     """Test workflow configuration."""
     name: str
@@ -77,13 +95,82 @@ class TestWorkflow:
     
     @classmethod
     def from_yaml(cls, path: Path) -> "TestWorkflow":
-        """Load workflow from YAML file."""
-        with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        return cls.from_dict(data)
+        """Load workflow from YAML file (cached until the file changes)."""
+        path = Path(path)
+        st = path.stat()
+        key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+        
+        workflow = _WORKFLOW_CACHE.get(key)
+        if workflow is None:
+            with open(path, "rb") as f:
+                data = yaml.load(f, Loader=_YamlLoader)
+            workflow = cls.from_dict(data)
+            
+            _WORKFLOW_CACHE[key] = workflow
+            if len(_WORKFLOW_CACHE) > _WORKFLOW_CACHE_SIZE:
+                _WORKFLOW_CACHE.popitem(last=False)
+        else:
+            _WORKFLOW_CACHE.move_to_end(key)
+        
+        # Callers may modify the workflow, so hand out a copy
+        return workflow.copy()
+    
+    def copy(self) -> "TestWorkflow":
+        """Copy with its own steps, variables and network filter containers."""
+        return replace(
+            self,
+            steps=list(self.steps),
+            variables=dict(self.variables),
+            network_filter=(
+                list(self.network_filter) if self.network_filter is not None else None
+            ),
+        )
+    
+    @staticmethod
+    def peek_header(
+        path: Path,
+        keys: Tuple[str, ...] = ("name", "description", "base_url", "version"),
+    ) -> Dict[str, str]:
+        """
+        Read top-level scalar metadata without parsing the whole workflow.
+        
+        Walks the YAML event stream and stops as soon as every requested
+        key is found or the top-level mapping ends, so steps are never built.
+        """
+        header: Dict[str, str] = {}
+        depth = 0
+        key: Optional[str] = None
+        
+        with open(path, "rb") as f:
+            for event in yaml.parse(f, Loader=_YamlLoader):
+                if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                    depth += 1
+                elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                    depth -= 1
+                    if depth == 0:
+                        break
+                    if depth == 1:
+                        # Nested value finished; next top-level scalar is a key
+                        key = None
+                elif depth == 1 and isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent)):
+                    if key is None:
+                        key = getattr(event, "value", "")
+                    else:
+                        if key in keys and isinstance(event, yaml.ScalarEvent):
+                            header[key] = event.value
+                            if len(header) == len(keys):
+                                break
+                        key = None
+        
+        return header
+    
+    @classmethod
+    def from_yaml_text(cls, text: str) -> "TestWorkflow":
+        """Load workflow from inline YAML content."""
+        return cls.from_dict(yaml.load(text, Loader=_YamlLoader))
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StepResult:
     """Result of a test step."""
     step_name: str
@@ -95,7 +182,7 @@ class StepResult:
     assertion_passed: Optional[bool] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     """Result of complete test run."""
     workflow_name: str
@@ -107,6 +194,18 @@ class TestResult:
     error_message: Optional[str] = None
 
 
+def _batch_steps(steps: List[TestStep]) -> Iterator[List[TestStep]]:
+    """Split steps into batches; consecutive steps sharing a group form one batch."""
+    batch: List[TestStep] = []
+    for step in steps:
+        if batch and (step.group is None or step.group != batch[-1].group):
+            yield batch
+            batch = []
+        batch.append(step)
+    if batch:
+        yield batch
+
+
 class TestWorkflowRunner:
     """
     Execute browser test workflows.
@@ -131,21 +230,45 @@ class TestWorkflowRunner:
         
         self._browser: Optional[BrowserManager] = None
         self._inspector: Optional[CDPNetworkInspector] = None
+        self._url_filter = None
+        
+        # Placeholder regex for the variables of the current run
+        self._variables: Optional[Mapping[str, str]] = None
+        self._variable_pattern: Optional[re.Pattern] = None
+        
+        # Assertion condition -> handler(expected, result, browser, inspector)
+        self._assert_handlers = {
+            "text_contains": self._assert_text_contains,
+            "text_equals": self._assert_text_equals,
+            "element_visible": self._assert_element_visible,
+            "url_contains": self._assert_url_contains,
+            "response_ok": self._assert_response_ok,
+        }
+    
+    def _compile_variables(self, variables: Mapping[str, str]):
+        """Build a single regex matching every {{variable}} placeholder."""
+        self._variables = variables
+        self._variable_pattern = None
+        if variables:
+            names = "|".join(re.escape(key) for key in variables)
+            self._variable_pattern = re.compile(r"\{\{(" + names + r")\}\}")
     
     def _substitute_variables(
         self, 
         text: Optional[str], 
-        variables: Dict[str, str]
+        variables: Mapping[str, str]
     ) -> Optional[str]:
         """Replace {{variable}} placeholders."""
-        if not text:
+        if not text or "{{" not in text:
             return text
         
-        result = text
-        for key, value in variables.items():
-            result = result.replace(f"{{{{{key}}}}}", value)
+        if variables is not self._variables:
+            self._compile_variables(variables)
+        
+        if self._variable_pattern is None:
+            return text
         
-        return result
+        return self._variable_pattern.sub(lambda m: str(variables[m.group(1)]), text)
     
     async def run(
         self, 
@@ -165,8 +288,12 @@ class TestWorkflowRunner:
         import time
         start_time = time.time()
         
-        # Merge variables
-        variables = {**workflow.variables, **(extra_variables or {})}
+        # Layer extra variables over the workflow's without copying either
+        variables = ChainMap(extra_variables or {}, workflow.variables)
+        self._compile_variables(variables)
+        
+        # Base URL without trailing slash, joined to relative navigate targets
+        base_url = workflow.base_url.rstrip("/")
         
         # Initialize browser
         config = workflow.browser_config or BrowserConfig()
@@ -182,33 +309,47 @@ class TestWorkflowRunner:
             
             # Initialize network inspector
             if workflow.network_filter:
-                url_filter = create_url_filter(include_patterns=workflow.network_filter)
+                self._url_filter = create_url_filter(include_patterns=workflow.network_filter)
             else:
-                url_filter = None
+                self._url_filter = None
             
             self._inspector = CDPNetworkInspector(
                 self._browser.page,
-                url_filter=url_filter,
+                url_filter=self._url_filter,
             )
             
-            # Execute steps
-            for step in workflow.steps:
-                result = await self._execute_step(step, variables, workflow.base_url)
-                step_results.append(result)
+            # Execute steps, running grouped steps concurrently
+            for batch in _batch_steps(workflow.steps):
+                if len(batch) == 1:
+                    results = [
+                        await self._execute_step(
+                            batch[0], variables, base_url, self._browser, self._inspector
+                        )
+                    ]
+                else:
+                    results = await self._execute_group(batch, variables, base_url)
                 
-                if result.network_log:
-                    network_logs.append(result.network_log)
-                
-                if not result.success and not step.optional:
-                    failed_step = step.name
-                    error_message = result.error
+                for step, result in zip(batch, results):
+                    step_results.append(result)
                     
-                    # Screenshot on failure
-                    if self.screenshot_on_failure:
-                        screenshot_path = self.output_dir / f"failure_{step.name}.png"
-                        await self._browser.screenshot(str(screenshot_path))
-                        step_results[-1].screenshot_path = str(screenshot_path)
+                    if result.network_log:
+                        network_logs.append(result.network_log)
                     
+                    if not result.success and not step.optional and failed_step is None:
+                        failed_step = step.name
+                        error_message = result.error
+                        
+                        # Screenshot on failure (grouped steps capture their own tab)
+                        if self.screenshot_on_failure and len(batch) == 1:
+                            screenshot_path = await self._save_failure_screenshot(
+                                step, self._browser
+                            )
+                            if screenshot_path:
+                                step_results[-1] = replace(
+                                    step_results[-1], screenshot_path=screenshot_path
+                                )
+                
+                if failed_step is not None:
                     break
         
         except Exception as e:
@@ -230,25 +371,81 @@ class TestWorkflowRunner:
             error_message=error_message,
         )
     
+    async def _save_failure_screenshot(
+        self,
+        step: TestStep,
+        browser: BrowserManager,
+    ) -> Optional[str]:
+        """Capture a screenshot for a failed step, writing it off the event loop."""
+        safe_name = _UNSAFE_FILENAME_RE.sub("_", step.name)[:64]
+        screenshot_path = self.output_dir / f"failure_{safe_name}.png"
+        
+        try:
+            data = await browser.screenshot_bytes()
+            await asyncio.to_thread(screenshot_path.write_bytes, data)
+        except Exception:
+            return None
+        
+        return str(screenshot_path)
+    
+    async def _execute_group(
+        self,
+        steps: List[TestStep],
+        variables: Mapping[str, str],
+        base_url: str,
+    ) -> List[StepResult]:
+        """Execute a group of steps concurrently, each in its own tab."""
+        async def run_in_tab(step: TestStep) -> StepResult:
+            try:
+                tab = await self._browser.new_tab()
+            except Exception as e:
+                return StepResult(step_name=step.name, success=False, error=str(e))
+            
+            try:
+                inspector = None
+                if step.capture_network:
+                    inspector = CDPNetworkInspector(tab.page, url_filter=self._url_filter)
+                result = await self._execute_step(step, variables, base_url, tab, inspector)
+                
+                # Screenshot the failing tab while it is still open
+                if not result.success and not step.optional and self.screenshot_on_failure:
+                    screenshot_path = await self._save_failure_screenshot(step, tab)
+                    if screenshot_path:
+                        result = replace(result, screenshot_path=screenshot_path)
+                return result
+            finally:
+                await tab.stop()
+        
+        return list(await asyncio.gather(*(run_in_tab(step) for step in steps)))
+    
     async def _execute_step(
         self,
         step: TestStep,
-        variables: Dict[str, str],
+        variables: Mapping[str, str],
         base_url: str,
+        browser: BrowserManager,
+        inspector: Optional[CDPNetworkInspector],
     ) -> StepResult:
-        """Execute a single test step."""
+        """Execute a single test step on the given page and its inspector (if any)."""
+        
         # Variable substitution
         selector = self._substitute_variables(step.selector, variables)
         value = self._substitute_variables(step.value, variables)
         
         # Prepend base URL for navigate actions
-        if step.action == "navigate" and value and not value.startswith("http"):
-            value = base_url.rstrip("/") + "/" + value.lstrip("/")
+        if (
+            step.action == "navigate"
+            and value
+            and not value.startswith(("http://", "https://"))
+        ):
+            value = f"{base_url}/{value.lstrip('/')}"
         
         # Start network capture if requested
         network_log = None
-        if step.capture_network and self._inspector:
-            await self._inspector.start()
+        capturing = False
+        if step.capture_network and inspector:
+            await inspector.start()
+            capturing = True
         
         try:
             # Execute action
@@ -259,12 +456,13 @@ class TestWorkflowRunner:
                 timeout=step.timeout,
             )
             
-            result = await self._browser.execute_action(action)
+            result = await browser.execute_action(action)
             
             # Stop network capture
-            if step.capture_network and self._inspector:
-                network_log = await self._inspector.stop()
-                self._inspector.clear()
+            if capturing:
+                capturing = False
+                network_log = await inspector.stop()
+                inspector.clear()
             
             # Check assertion
             assertion_passed = None
@@ -274,6 +472,8 @@ class TestWorkflowRunner:
                     step.assert_value,
                     result,
                     variables,
+                    browser,
+                    inspector,
                 )
                 
                 if not assertion_passed:
@@ -302,37 +502,53 @@ class TestWorkflowRunner:
                 error=str(e),
                 network_log=network_log,
             )
+        
+        finally:
+            # The action failed before capture was stopped; release the page
+            if capturing:
+                await inspector.stop()
+                inspector.clear()
     
     async def _check_assertion(
         self,
         condition: str,
         expected: Optional[str],
         result: ActionResult,
-        variables: Dict[str, str],
+        variables: Mapping[str, str],
+        browser: BrowserManager,
+        inspector: Optional[CDPNetworkInspector],
     ) -> bool:
         """Check an assertion condition."""
-        expected = self._substitute_variables(expected, variables)
-        
-        if condition == "text_contains":
-            return expected in result.output if expected else False
-        
-        elif condition == "text_equals":
-            return result.output == expected
-        
-        elif condition == "element_visible":
-            return result.success
-        
-        elif condition == "url_contains":
-            url = self._browser.page.url
-            return expected in url if expected else False
-        
-        elif condition == "response_ok":
-            # Check if all captured requests succeeded
-            if self._inspector:
-                failed = self._inspector.get_failed_requests()
-                return len(failed) == 0
+        handler = self._assert_handlers.get(condition)
+        if handler is None:
             return True
         
+        expected = self._substitute_variables(expected, variables)
+        return await handler(expected, result, browser, inspector)
+    
+    async def _assert_text_contains(self, expected, result, browser, inspector) -> bool:
+        """Output contains the expected text."""
+        return expected in result.output if expected else False
+    
+    async def _assert_text_equals(self, expected, result, browser, inspector) -> bool:
+        """Output equals the expected text."""
+        return result.output == expected
+    
+    async def _assert_element_visible(self, expected, result, browser, inspector) -> bool:
+        """The action found its element."""
+        return result.success
+    
+    async def _assert_url_contains(self, expected, result, browser, inspector) -> bool:
+        """Current page URL contains the expected text."""
+        url = browser.page.url
+        return expected in url if expected else False
+    
+    async def _assert_response_ok(self, expected, result, browser, inspector) -> bool:
+        """No captured request failed."""
+        # Check if all captured requests succeeded
+        if inspector:
+            failed = inspector.get_failed_requests()
+            return len(failed) == 0
         return True
     
     async def run_from_yaml(
@@ -5,6 +5,8 @@ Tools for editing code files with diffs and replacements.
 """
 
 import difflib
+import functools
+import io
 import re
 from pathlib import Path
 from typing import Optional, List
@@ -12,6 +14,19 @@ from typing import Optional, List
 from .registry import tool, ToolCategory, ToolParameter, ToolResult
 
 
+# Maximum size of show_diff output, in characters
+_MAX_DIFF_CHARS = 2_000_000
+
+# Unified diff hunk header: @@ -X,Y +X,Y @@
+_HUNK_RE = re.compile(rb'^@@ -(\d+)(?:,(\d+))? \+(\d+),?\d* @@')
+
+
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    """Compile a user regex, reusing it across tool calls."""
+    return re.compile(pattern)
+
+
 @tool(
     name="replace_in_file",
     description="Replace a specific string or pattern in a file. Use for small, targeted edits.",
@@ -69,13 +84,12 @@ async def replace_in_file(
         content = file_path.read_text(encoding="utf-8")
         
         if is_regex:
-            if count > 0:
-                new_content = re.sub(old_text, new_text, content, count=count)
-            else:
-                new_content = re.sub(old_text, new_text, content)
-            replacements = len(re.findall(old_text, content))
+            new_content, replacements = _compile(old_text).subn(
+                new_text, content, count=max(count, 0)
+            )
         else:
-            if old_text not in content:
+            replacements = content.count(old_text)
+            if replacements == 0:
                 return ToolResult(
                     success=False,
                     output="",
@@ -83,10 +97,8 @@ async def replace_in_file(
                 )
             
             if count > 0:
-                new_content = content.replace(old_text, new_text, count)
-            else:
-                new_content = content.replace(old_text, new_text)
-            replacements = content.count(old_text)
+                replacements = min(replacements, count)
+            new_content = content.replace(old_text, new_text, replacements)
         
         file_path.write_text(new_content, encoding="utf-8")
         
@@ -129,60 +141,80 @@ async def apply_diff(path: str, diff: str) -> ToolResult:
         
         if not file_path.exists():
             # Create new file if diff creates it
+            original = None
             original_lines = []
         else:
-            original_lines = file_path.read_text(encoding="utf-8").splitlines(keepends=True)
+            # Work on UTF-8 bytes; line boundaries are ASCII so splitting is safe
+            original = file_path.read_bytes()
+            original_lines = original.splitlines(keepends=True)
         
         # Parse diff hunks
-        new_lines = list(original_lines)
-        diff_lines = diff.splitlines(keepends=True)
+        diff_lines = diff.encode("utf-8").splitlines(keepends=True)
         
-        # Simple diff application (handles @@ -X,Y +X,Y @@ format)
-        offset = 0
-        hunk_pattern = re.compile(r'^@@ -(\d+),?\d* \+(\d+),?\d* @@')
+        # Simple diff application (handles @@ -X,Y +X,Y @@ format).
+        # The output is assembled append-only while walking the original lines.
+        new_lines: List[bytes] = []
+        orig_idx = 0
         
         i = 0
         while i < len(diff_lines):
             line = diff_lines[i]
             
-            match = hunk_pattern.match(line)
+            match = _HUNK_RE.match(line)
             if match:
-                start_orig = int(match.group(1)) - 1
+                # A zero-length hunk inserts after the given line
+                start_orig = int(match.group(1))
+                if match.group(2) != b"0":
+                    start_orig -= 1
+                
+                # Copy unchanged lines up to the hunk
+                if start_orig > orig_idx:
+                    new_lines.extend(original_lines[orig_idx:start_orig])
+                    orig_idx = start_orig
                 i += 1
                 
                 # Apply hunk
                 while i < len(diff_lines):
                     dline = diff_lines[i]
-                    if dline.startswith('@@') or not (dline.startswith('+') or dline.startswith('-') or dline.startswith(' ')):
+                    if dline.startswith(b'@@') or not dline.startswith((b'+', b'-', b' ')):
                         break
                     
-                    if dline.startswith('-'):
+                    if dline.startswith(b'-'):
                         # Remove line
-                        if start_orig + offset < len(new_lines):
-                            del new_lines[start_orig + offset]
-                            offset -= 1
-                    elif dline.startswith('+'):
+                        orig_idx += 1
+                    elif dline.startswith(b'+'):
                         # Add line
                         content = dline[1:]
-                        if not content.endswith('\n'):
-                            content += '\n'
-                        new_lines.insert(start_orig + offset + 1, content)
-                        offset += 1
-                        start_orig += 1
+                        if not content.endswith(b'\n'):
+                            content += b'\n'
+                        new_lines.append(content)
                     else:
                         # Context line
-                        start_orig += 1
+                        if orig_idx < len(original_lines):
+                            new_lines.append(original_lines[orig_idx])
+                        orig_idx += 1
                     
                     i += 1
             else:
                 i += 1
         
-        file_path.write_text("".join(new_lines), encoding="utf-8")
+        new_lines.extend(original_lines[orig_idx:])
+        
+        new_content = b"".join(new_lines)
+        if new_content == original:
+            # Skip the write so the file's mtime is left alone
+            return ToolResult(
+                success=True,
+                output=f"No changes to {file_path}",
+                metadata={"path": str(file_path), "changed": False}
+            )
+        
+        file_path.write_bytes(new_content)
         
         return ToolResult(
             success=True,
             output=f"Applied diff to {file_path}",
-            metadata={"path": str(file_path)}
+            metadata={"path": str(file_path), "changed": True}
         )
     
     except Exception as e:
@@ -223,17 +255,24 @@ async def insert_lines(path: str, line_number: int, content: str) -> ToolResult:
         if not file_path.exists():
             return ToolResult(success=False, output="", error=f"File not found: {path}")
         
-        lines = file_path.read_text(encoding="utf-8").splitlines(keepends=True)
+        new_lines = content.encode("utf-8").splitlines(keepends=True)
+        if not new_lines:
+            # Nothing to insert; leave the file untouched
+            return ToolResult(
+                success=True,
+                output=f"No changes to {file_path}",
+                metadata={"path": str(file_path), "line": line_number, "lines_inserted": 0}
+            )
+        if not new_lines[-1].endswith(b'\n'):
+            new_lines[-1] += b'\n'
         
-        insert_idx = max(0, min(line_number - 1, len(lines)))
+        lines = file_path.read_bytes().splitlines(keepends=True)
         
-        new_lines = content.splitlines(keepends=True)
-        if new_lines and not new_lines[-1].endswith('\n'):
-            new_lines[-1] += '\n'
+        insert_idx = max(0, min(line_number - 1, len(lines)))
         
         lines[insert_idx:insert_idx] = new_lines
         
-        file_path.write_text("".join(lines), encoding="utf-8")
+        file_path.write_bytes(b"".join(lines))
         
         return ToolResult(
             success=True,
@@ -283,7 +322,17 @@ async def show_diff(old_content: str, new_content: str, filename: str = "file")
         tofile=f"b/{filename}",
     )
     
-    diff_str = "".join(diff)
+    # Stream the diff into a bounded buffer instead of materializing it all
+    buf = io.StringIO()
+    total = 0
+    for line in diff:
+        total += len(line)
+        if total > _MAX_DIFF_CHARS:
+            buf.write("\n... [diff truncated] ...\n")
+            break
+        buf.write(line)
+    
+    diff_str = buf.getvalue()
     
     return ToolResult(
         success=True,
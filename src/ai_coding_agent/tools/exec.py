@@ -5,15 +5,127 @@ Tools for running shell commands and scripts.
 """
 
 import asyncio
+import codecs
+import functools
 import os
 import sys
 import shlex
+from collections import deque
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 from .registry import tool, ToolCategory, ToolParameter, ToolResult
 
 
+# Characters of command output kept from the start and end of each stream
+_HEAD_CHARS = 2 * 1024 * 1024
+_TAIL_CHARS = 2 * 1024 * 1024
+_READ_CHUNK = 64 * 1024
+
+# Characters that need a shell to interpret the command
+_SHELL_CHARS = frozenset('|&;<>()$`\\"\'*?[]{}~#\n\r')
+
+
+class _CappedOutput:
+    """
+    Stream buffer that keeps the head and tail, dropping the middle.
+    
+    Chunks are decoded incrementally as they arrive, so no single large
+    decode blocks the event loop.
+    """
+    
+    def __init__(self, head_limit: int = _HEAD_CHARS, tail_limit: int = _TAIL_CHARS):
+        self.head_limit = head_limit
+        self.tail_limit = tail_limit
+        self.head: List[str] = []
+        self.head_size = 0
+        self.tail: deque = deque()
+        self.tail_size = 0
+        self.dropped = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    def append(self, chunk: bytes, final: bool = False):
+        """Decode and add a chunk of output."""
+        text = self._decoder.decode(chunk, final=final)
+        
+        room = self.head_limit - self.head_size
+        if room > 0:
+            part = text[:room]
+            self.head.append(part)
+            self.head_size += len(part)
+            text = text[room:]
+        if not text:
+            return
+        
+        self.tail.append(text)
+        self.tail_size += len(text)
+        
+        # Drop the oldest tail characters beyond the limit
+        while self.tail_size > self.tail_limit:
+            excess = self.tail_size - self.tail_limit
+            first = self.tail[0]
+            if len(first) <= excess:
+                self.tail.popleft()
+                removed = len(first)
+            else:
+                self.tail[0] = first[excess:]
+                removed = excess
+            self.tail_size -= removed
+            self.dropped += removed
+    
+    def text(self) -> str:
+        """Return the retained output, marking any truncation."""
+        text = "".join(self.head)
+        if self.dropped:
+            text += f"\n... [truncated {self.dropped} characters] ...\n"
+        return text + "".join(self.tail)
+
+
+# Windows subprocess environment, rebuilt when os.environ grows or shrinks
+_win_env: Optional[Dict[str, str]] = None
+_win_env_size = -1
+
+
+def _get_win_env() -> Dict[str, str]:
+    """Get os.environ with PYTHONIOENCODING forced to UTF-8 (cached)."""
+    global _win_env, _win_env_size
+    if _win_env is None or _win_env_size != len(os.environ):
+        _win_env = {**os.environ, "PYTHONIOENCODING": "utf-8"}
+        _win_env_size = len(os.environ)
+    return _win_env
+
+
+def _split_simple_command(command: str) -> Optional[List[str]]:
+    """Split a command that needs no shell features into argv, else None."""
+    if any(c in _SHELL_CHARS for c in command):
+        return None
+    argv = shlex.split(command)
+    if not argv or "=" in argv[0]:
+        # Empty, or starts with an environment assignment
+        return None
+    return argv
+
+
+# Namespace template copied for each run_python call
+_BASE_NAMESPACE = {"__builtins__": __builtins__}
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_python(code: str):
+    """Compile run_python source, reusing code objects for repeated snippets."""
+    return compile(code, "<run_python>", "exec")
+
+
+async def _drain(stream: asyncio.StreamReader, buffer: _CappedOutput):
+    """Read a subprocess pipe to EOF into a capped buffer."""
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        buffer.append(chunk)
+    buffer.append(b"", final=True)
+
+
 @tool(
     name="run_command",
     description="Execute a shell command and return its output. Use for running scripts, build commands, etc.",
@@ -62,20 +174,43 @@ async def run_command(
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=str(work_dir),
-                env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+                env=_get_win_env(),
             )
         else:
-            # Unix: use shell
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=str(work_dir),
-            )
+            process = None
+            argv = _split_simple_command(command)
+            if argv:
+                # Unix, plain command: exec directly without forking a shell
+                try:
+                    process = await asyncio.create_subprocess_exec(
+                        *argv,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.PIPE,
+                        cwd=str(work_dir),
+                    )
+                except OSError:
+                    # Not an executable (e.g. a shell builtin); use the shell
+                    process = None
+            
+            if process is None:
+                # Unix: use shell
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(work_dir),
+                )
         
+        # Stream both pipes into bounded buffers
+        stdout_buf = _CappedOutput()
+        stderr_buf = _CappedOutput()
         try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(),
+            await asyncio.wait_for(
+                asyncio.gather(
+                    _drain(process.stdout, stdout_buf),
+                    _drain(process.stderr, stderr_buf),
+                    process.wait(),
+                ),
                 timeout=timeout
             )
         except asyncio.TimeoutError:
@@ -87,8 +222,8 @@ async def run_command(
             )
         
         # Decode output
-        stdout_str = stdout.decode("utf-8", errors="replace") if stdout else ""
-        stderr_str = stderr.decode("utf-8", errors="replace") if stderr else ""
+        stdout_str = stdout_buf.text()
+        stderr_str = stderr_buf.text()
         
         # Combine output
         output = stdout_str
@@ -129,10 +264,10 @@ async def run_python(code: str) -> ToolResult:
     """Execute Python code."""
     try:
         # Create a temporary namespace
-        namespace = {"__builtins__": __builtins__}
+        namespace = _BASE_NAMESPACE.copy()
         
         # Compile and exec
-        exec(code, namespace)
+        exec(_compile_python(code), namespace)
         
         # Check for result variable
         result = namespace.get("result", namespace.get("output", None))
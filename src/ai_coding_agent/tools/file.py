@@ -4,14 +4,130 @@ File Operations Tools
 Tools for reading, writing, and managing files.
 """
 
+import asyncio
+import codecs
 import os
+import stat
 import glob as glob_module
+import itertools
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from .registry import tool, ToolCategory, ToolParameter, ToolResult
 
 
+_WRITE_CHUNK = 1 << 20
+
+
+def _stat_path(path: Path) -> Optional[os.stat_result]:
+    """Stat a path once, returning None if it does not exist."""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode UTF-8 with the same newline translation as read_text."""
+    content = data.decode("utf-8")
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _split_magic(pattern: str) -> Tuple[str, str]:
+    """Split a glob into its literal directory prefix and the remaining pattern."""
+    parts = pattern.split("/")
+    literal = list(itertools.takewhile(lambda part: not glob_module.has_magic(part), parts[:-1]))
+    return "/".join(literal), "/".join(parts[len(literal):])
+
+
+def _sorted_entries(dir_path: str) -> List[os.DirEntry]:
+    """Return the entries of one directory sorted by name."""
+    with os.scandir(dir_path) as it:
+        return sorted(it, key=attrgetter("name"))
+
+
+def _scan_dir(dir_path: str, recursive: bool) -> List[Tuple[str, os.DirEntry]]:
+    """List (relative path, DirEntry) pairs under a directory, sorted by path."""
+    # Pre-order walk over name-sorted directories yields full path order
+    # without ever comparing whole paths
+    entries = []
+    stack = [("", iter(_sorted_entries(dir_path)))]
+    while stack:
+        prefix, children = stack[-1]
+        entry = next(children, None)
+        if entry is None:
+            stack.pop()
+            continue
+        
+        rel_path = prefix + entry.name
+        entries.append((rel_path, entry))
+        if recursive and entry.is_dir(follow_symlinks=False):
+            try:
+                children = _sorted_entries(entry.path)
+            except OSError:
+                # Unreadable directories are listed but not descended into
+                continue
+            stack.append((rel_path + os.sep, iter(children)))
+    
+    return entries
+
+
+def _read_line_range(file_path: Path, start_line: Optional[int], end_line: Optional[int]) -> bytes:
+    """Read only the requested lines, skipping the head without decoding it."""
+    start = (start_line - 1) if start_line else 0
+    with open(file_path, "rb") as f:
+        for _ in range(start):
+            if not f.readline():
+                return b""
+        if not end_line:
+            return f.read()
+        chunks = []
+        for _ in range(end_line - start):
+            line = f.readline()
+            if not line:
+                break
+            chunks.append(line)
+        return b"".join(chunks)
+
+
+def _read_file_sync(
+    path: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+) -> ToolResult:
+    """Read file contents, optionally with line range."""
+    try:
+        file_path = Path(path).resolve()
+        st = _stat_path(file_path)
+        
+        if st is None:
+            return ToolResult(success=False, output="", error=f"File not found: {path}")
+        
+        if not stat.S_ISREG(st.st_mode):
+            return ToolResult(success=False, output="", error=f"Not a file: {path}")
+        
+        if start_line is not None or end_line is not None:
+            data = _read_line_range(file_path, start_line, end_line)
+        else:
+            data = file_path.read_bytes()
+        
+        content = _decode_text(data)
+        
+        return ToolResult(
+            success=True,
+            output=content,
+            metadata={"path": str(file_path), "size": st.st_size}
+        )
+    
+    except UnicodeDecodeError:
+        return ToolResult(success=False, output="", error=f"Cannot read binary file: {path}")
+    except Exception as e:
+        return ToolResult(success=False, output="", error=str(e))
+
+
 @tool(
     name="read_file",
     description="Read the contents of a file. Returns the file content as text.",
@@ -43,32 +159,36 @@ async def read_file(
     end_line: Optional[int] = None,
 ) -> ToolResult:
     """Read file contents, optionally with line range."""
+    return await asyncio.to_thread(_read_file_sync, path, start_line, end_line)
+
+
+def _write_file_sync(path: str, content: str, append: bool = False) -> ToolResult:
+    """Write content to a file."""
     try:
         file_path = Path(path).resolve()
         
-        if not file_path.exists():
-            return ToolResult(success=False, output="", error=f"File not found: {path}")
-        
-        if not file_path.is_file():
-            return ToolResult(success=False, output="", error=f"Not a file: {path}")
-        
-        content = file_path.read_text(encoding="utf-8")
+        # Create parent directories if needed
+        file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Apply line range if specified
-        if start_line is not None or end_line is not None:
-            lines = content.splitlines(keepends=True)
-            start = (start_line - 1) if start_line else 0
-            end = end_line if end_line else len(lines)
-            content = "".join(lines[start:end])
+        with open(file_path, "ab" if append else "wb") as f:
+            if len(content) > _WRITE_CHUNK:
+                # Encode large content piecewise so peak memory stays near one chunk
+                encoder = codecs.getincrementalencoder("utf-8")()
+                bytes_written = 0
+                for start in range(0, len(content), _WRITE_CHUNK):
+                    bytes_written += f.write(encoder.encode(content[start:start + _WRITE_CHUNK]))
+                bytes_written += f.write(encoder.encode("", final=True))
+            else:
+                data = content.encode("utf-8")
+                f.write(data)
+                bytes_written = len(data)
         
         return ToolResult(
             success=True,
-            output=content,
-            metadata={"path": str(file_path), "size": file_path.stat().st_size}
+            output=f"{'Appended to' if append else 'Wrote'} {file_path}",
+            metadata={"path": str(file_path), "bytes_written": bytes_written}
         )
     
-    except UnicodeDecodeError:
-        return ToolResult(success=False, output="", error=f"Cannot read binary file: {path}")
     except Exception as e:
         return ToolResult(success=False, output="", error=str(e))
 
@@ -102,20 +222,57 @@ async def read_file(
 )
 async def write_file(path: str, content: str, append: bool = False) -> ToolResult:
     """Write content to a file."""
+    return await asyncio.to_thread(_write_file_sync, path, content, append)
+
+
+def _list_dir_sync(
+    path: str,
+    recursive: bool = False,
+    pattern: Optional[str] = None,
+) -> ToolResult:
+    """List directory contents."""
     try:
-        file_path = Path(path).resolve()
+        dir_path = Path(path).resolve()
+        st = _stat_path(dir_path)
         
-        # Create parent directories if needed
-        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if st is None:
+            return ToolResult(success=False, output="", error=f"Directory not found: {path}")
         
-        mode = "a" if append else "w"
-        file_path.write_text(content, encoding="utf-8") if not append else \
-            file_path.open(mode, encoding="utf-8").write(content)
+        if not stat.S_ISDIR(st.st_mode):
+            return ToolResult(success=False, output="", error=f"Not a directory: {path}")
+        
+        lines = []
+        if pattern:
+            if recursive:
+                items = list(dir_path.rglob(pattern))
+            else:
+                # Descend straight to the literal directory part of the pattern
+                base, rest = _split_magic(pattern)
+                if base and rest and not os.path.isabs(base):
+                    items = list((dir_path / base).glob(rest))
+                else:
+                    items = list(dir_path.glob(pattern))
+            
+            root = str(dir_path)
+            for item in sorted(items):
+                rel_path = os.path.relpath(item, root)
+                item_stat = os.stat(item)
+                if stat.S_ISDIR(item_stat.st_mode):
+                    lines.append(f"📁 {rel_path}/")
+                else:
+                    lines.append(f"📄 {rel_path} ({item_stat.st_size} bytes)")
+        else:
+            # scandir reuses the file type from readdir and caches stat per entry
+            for rel_path, entry in _scan_dir(str(dir_path), recursive):
+                if entry.is_dir():
+                    lines.append(f"📁 {rel_path}/")
+                else:
+                    lines.append(f"📄 {rel_path} ({entry.stat().st_size} bytes)")
         
         return ToolResult(
             success=True,
-            output=f"{'Appended to' if append else 'Wrote'} {file_path}",
-            metadata={"path": str(file_path), "bytes_written": len(content.encode())}
+            output="\n".join(lines) if lines else "(empty directory)",
+            metadata={"path": str(dir_path), "count": len(lines)}
         )
     
     except Exception as e:
@@ -154,44 +311,7 @@ async def list_dir(
     pattern: Optional[str] = None,
 ) -> ToolResult:
     """List directory contents."""
-    try:
-        dir_path = Path(path).resolve()
-        
-        if not dir_path.exists():
-            return ToolResult(success=False, output="", error=f"Directory not found: {path}")
-        
-        if not dir_path.is_dir():
-            return ToolResult(success=False, output="", error=f"Not a directory: {path}")
-        
-        if pattern:
-            if recursive:
-                items = list(dir_path.rglob(pattern))
-            else:
-                items = list(dir_path.glob(pattern))
-        else:
-            if recursive:
-                items = list(dir_path.rglob("*"))
-            else:
-                items = list(dir_path.iterdir())
-        
-        # Format output
-        lines = []
-        for item in sorted(items):
-            rel_path = item.relative_to(dir_path)
-            if item.is_dir():
-                lines.append(f"📁 {rel_path}/")
-            else:
-                size = item.stat().st_size
-                lines.append(f"📄 {rel_path} ({size} bytes)")
-        
-        return ToolResult(
-            success=True,
-            output="\n".join(lines) if lines else "(empty directory)",
-            metadata={"path": str(dir_path), "count": len(items)}
-        )
-    
-    except Exception as e:
-        return ToolResult(success=False, output="", error=str(e))
+    return await asyncio.to_thread(_list_dir_sync, path, recursive, pattern)
 
 
 @tool(
@@ -273,10 +393,10 @@ async def delete_file(path: str) -> ToolResult:
 )
 async def file_exists(path: str) -> ToolResult:
     """Check if path exists."""
-    file_path = Path(path).resolve()
-    exists = file_path.exists()
-    is_file = file_path.is_file() if exists else False
-    is_dir = file_path.is_dir() if exists else False
+    st = _stat_path(Path(path).resolve())
+    exists = st is not None
+    is_file = exists and stat.S_ISREG(st.st_mode)
+    is_dir = exists and stat.S_ISDIR(st.st_mode)
     
     return ToolResult(
         success=True,
@@ -4,9 +4,10 @@ Tool Registry
 Central registry for all available tools.
 """
 
+import itertools
 import json
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Awaitable, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Awaitable, Union
 from enum import Enum
 
 
@@ -42,9 +43,18 @@ class ToolDefinition:
     handler: Callable[..., Awaitable[Any]]
     parameters: List[ToolParameter] = field(default_factory=list)
     requires_confirmation: bool = False
+    _openai_cache: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def to_openai_format(self) -> Dict[str, Any]:
-        """Convert to OpenAI function calling format."""
+        """Convert to OpenAI function calling format (built once, then cached)."""
+        if self._openai_cache is None:
+            self._openai_cache = self._build_openai_format()
+        return self._openai_cache
+    
+    def _build_openai_format(self) -> Dict[str, Any]:
+        """Build the OpenAI function schema from the parameter list."""
         properties = {}
         required = []
         
@@ -100,11 +110,22 @@ class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, ToolDefinition] = {}
         self._categories: Dict[ToolCategory, List[str]] = {cat: [] for cat in ToolCategory}
+        self._category_openai: Dict[ToolCategory, List[Dict[str, Any]]] = {
+            cat: [] for cat in ToolCategory
+        }
+        self._openai_cache: Dict[Optional[FrozenSet[ToolCategory]], List[Dict[str, Any]]] = {}
     
     def register(self, tool: ToolDefinition) -> None:
         """Register a tool."""
+        previous = self._tools.get(tool.name)
+        if previous is not None:
+            self._categories[previous.category].remove(previous.name)
+            self._category_openai[previous.category].remove(previous.to_openai_format())
+        
         self._tools[tool.name] = tool
         self._categories[tool.category].append(tool.name)
+        self._category_openai[tool.category].append(tool.to_openai_format())
+        self._openai_cache.clear()
     
     def get(self, name: str) -> Optional[ToolDefinition]:
         """Get tool by name."""
@@ -122,7 +143,10 @@ class ToolRegistry:
         """List all tool names."""
         return list(self._tools.keys())
     
-    def to_openai_format(self, include_categories: Optional[List[ToolCategory]] = None) -> List[Dict[str, Any]]:
+    def to_openai_format(
+        self,
+        include_categories: Optional[List[ToolCategory]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Convert all tools to OpenAI function calling format.
         
@@ -130,14 +154,22 @@ class ToolRegistry:
             include_categories: Optional filter by categories
         
         Returns:
-            List of tools in OpenAI format
+            List of tools in OpenAI format (cached per category filter; do not mutate)
         """
-        tools = []
+        key = None if include_categories is None else frozenset(include_categories)
+        tools = self._openai_cache.get(key)
+        if tools is not None:
+            return tools
         
-        for tool in self._tools.values():
-            if include_categories is None or tool.category in include_categories:
-                tools.append(tool.to_openai_format())
+        if key is None:
+            tools = [tool.to_openai_format() for tool in self._tools.values()]
+        else:
+            # Only walk the selected categories, in enum order
+            tools = list(itertools.chain.from_iterable(
+                self._category_openai[cat] for cat in ToolCategory if cat in key
+            ))
         
+        self._openai_cache[key] = tools
         return tools
     
     async def execute(
@@ -4,18 +4,423 @@ Search Tools
 Tools for searching files and content.
 """
 
+import asyncio
+import fnmatch
+import functools
+import itertools
+import mmap
 import os
 import re
+import stat
 import subprocess
-from pathlib import Path
-from typing import Optional, List
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePath
+from typing import Iterator, Optional, List, Tuple, Union
 
 from .registry import tool, ToolCategory, ToolParameter, ToolResult
 
 
+# Directories and file types the Python grep fallback never descends into or reads
+_SKIP_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv", "dist", "build"})
+_BINARY_EXT = frozenset({
+    ".pyc", ".so", ".o", ".png", ".jpg", ".pdf", ".zip", ".tar", ".gz", ".wasm",
+})
+
+# File scans are I/O bound and release the GIL, so oversubscribe the CPUs.
+# The pool lives for the whole process so its threads (and their scratch
+# buffers) are reused across grep calls; threads start only when needed.
+_GREP_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_GREP_EXECUTOR = ThreadPoolExecutor(max_workers=_GREP_WORKERS, thread_name_prefix="grep")
+
+# Characters that make a name pattern a glob rather than an exact name
+_GLOB_MAGIC_RE = re.compile(r"[*?\[]")
+
+# Wall-clock limit for the ripgrep tool before rg is killed
+_RG_TIMEOUT = 30
+
+# Escapes whose bytes meaning differs from (or is invalid next to) the str one
+_UNSAFE_BYTES_ESCAPES = frozenset("wWbBdDsSAZuUNx0123456789")
+
+# Readahead hint for mmap scans; not available on every platform
+_MADV_SEQUENTIAL = getattr(mmap, "MADV_SEQUENTIAL", None)
+
+# Files up to this size are read into a per-thread scratch buffer rather than
+# mapped; the buffer starts small and grows to fit the largest such file
+_SCRATCH_SIZE = 1 << 20
+_SCRATCH_MIN = 1 << 16
+_SCRATCH = threading.local()
+
+
+@functools.lru_cache(maxsize=128)
+def _compile(pattern: Union[str, bytes], flags: int) -> re.Pattern:
+    """Compile a search regex, reusing it across tool calls."""
+    return re.compile(pattern, flags)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_glob(pattern: str) -> re.Pattern:
+    """Translate a glob to a compiled regex, reusing it across tool calls."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _stream_rg(cmd: List[str], cwd: str, max_results: int) -> Tuple[List[str], bool, int]:
+    """Run rg, reading its output line by line and stopping it once max_results is reached.
+    
+    Returns the lines, whether output was cut off, and rg's exit code.
+    Raises subprocess.TimeoutExpired if rg had to be killed after _RG_TIMEOUT.
+    """
+    lines: List[str] = []
+    truncated = False
+    timed_out = threading.Event()
+    
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        cwd=cwd,
+    ) as process:
+        def kill():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(_RG_TIMEOUT, kill)
+        timer.start()
+        try:
+            for line in process.stdout:
+                if len(lines) >= max_results:
+                    truncated = True
+                    process.terminate()
+                    break
+                lines.append(line.rstrip("\n"))
+        finally:
+            timer.cancel()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, _RG_TIMEOUT)
+    
+    return lines, truncated, process.returncode
+
+
+def _rg_search(
+    pattern: str,
+    search_path: Path,
+    include: Optional[str],
+    case_sensitive: bool,
+    max_results: int,
+) -> Optional[List[str]]:
+    """Search with ripgrep. Returns None if rg is unavailable or errors."""
+    if search_path.is_file():
+        cwd, target = search_path.parent, search_path.name
+    else:
+        cwd, target = search_path, "."
+    
+    # -0 puts a NUL after the file name so paths containing ':' parse safely
+    cmd = ["rg", "--line-number", "--no-heading", "--with-filename", "-0",
+           "-m", str(max_results)]
+    if not case_sensitive:
+        cmd.append("-i")
+    
+    # Search the same files as the Python fallback: hidden, ignored and
+    # binary files included, minus _SKIP_DIRS and _BINARY_EXT
+    cmd.extend(["--hidden", "--no-ignore", "--text"])
+    if include:
+        cmd.extend(["-g", include])
+    for skip_dir in sorted(_SKIP_DIRS):
+        cmd.extend(["-g", f"!{skip_dir}/"])
+    for ext in sorted(_BINARY_EXT):
+        cmd.extend(["--iglob", f"!*{ext}"])
+    cmd.extend(["-e", pattern, target])
+    
+    try:
+        lines, truncated, returncode = _stream_rg(cmd, str(cwd), max_results)
+    except (OSError, subprocess.TimeoutExpired):
+        # Missing, unlaunchable or hung rg: let the Python search handle it
+        return None
+    
+    # Exit code 1 means no matches; 2 means an error (e.g. unsupported regex).
+    # A run we stopped ourselves at max_results still has valid output.
+    if not truncated and returncode not in (0, 1):
+        return None
+    
+    results = []
+    for line in lines:
+        file_name, sep, rest = line.partition("\0")
+        line_no, sep2, text = rest.partition(":")
+        if not sep or not sep2:
+            continue
+        if file_name.startswith("./"):
+            file_name = file_name[2:]
+        results.append(f"{file_name}:{line_no}: {text.strip()}")
+        if len(results) >= max_results:
+            break
+    
+    return results
+
+
+def _iter_files(root: Path, include: Optional[str]) -> Iterator[str]:
+    """Yield file paths under root, optionally filtered by a glob pattern."""
+    root_str = str(root)
+    # rglob treats a leading "**/" as a no-op, so root-level files match too
+    while include is not None and include.startswith("**/"):
+        include = include[3:]
+    
+    match_name = rel_pattern = None
+    if include is not None:
+        if "/" in include:
+            # Path pattern: match components from the right, like rglob
+            rel_pattern = include
+        elif not _GLOB_MAGIC_RE.search(include):
+            # Exact file name: a plain string compare instead of a regex match
+            match_name = include.__eq__
+        else:
+            match_name = _compile_glob(include).match
+    
+    # Iterative DFS that prunes junk directories and never opens binaries
+    stack = [root_str]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in _SKIP_DIRS:
+                        stack.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            
+            if os.path.splitext(entry.name)[1].lower() in _BINARY_EXT:
+                continue
+            if rel_pattern is not None:
+                if PurePath(os.path.relpath(entry.path, root_str)).match(rel_pattern):
+                    yield entry.path
+            elif match_name is None or match_name(entry.name):
+                yield entry.path
+
+
+def _bytes_prefilter_safe(regex: re.Pattern) -> bool:
+    """Whether a bytes regex over the raw file finds every line the str regex matches.
+    
+    Rejects anything whose bytes meaning can miss text the str regex matches:
+    Unicode-aware classes and escapes, '.', '$', negated sets, inline flags
+    and IGNORECASE.
+    """
+    pattern = regex.pattern
+    if not pattern.isascii() or regex.flags & re.IGNORECASE:
+        return False
+    
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escaped = pattern[i + 1:i + 2]
+            if escaped and escaped in _UNSAFE_BYTES_ESCAPES:
+                return False
+            i += 2
+            continue
+        if char in ".$" or pattern.startswith("[^", i):
+            return False
+        if pattern.startswith("(?", i) and pattern[i + 2:i + 3].isalpha() and pattern[i + 2] != "P":
+            return False
+        i += 1
+    return True
+
+
+def _scan_file(
+    file_path: str,
+    regex: re.Pattern,
+    byte_regex: Optional[re.Pattern],
+    max_results: int,
+) -> List[Tuple[int, str]]:
+    """Return (line number, line) pairs for the lines of a file that match regex."""
+    matches = []
+    
+    if byte_regex is None:
+        with open(file_path, "r", encoding="utf-8", errors="ignore", buffering=1 << 16) as f:
+            for i, line in enumerate(f, 1):
+                if regex.search(line[:-1] if line.endswith("\n") else line):
+                    matches.append((i, line))
+                    if len(matches) >= max_results:
+                        break
+        return matches
+    
+    # Prefilter: scan the raw file in C with the bytes regex and only
+    # decode candidate lines. Small files are read into a reusable per-thread
+    # buffer; larger ones are mapped instead of copied.
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return matches
+        
+        if size <= _SCRATCH_SIZE:
+            data = _scratch_buffer(size)
+            view = memoryview(data)
+            size = 0
+            while size < len(data):
+                read = f.readinto(view[size:])
+                if not read:
+                    break
+                size += read
+            view.release()
+            return _scan_bytes(data, size, regex, byte_regex, max_results)
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _MADV_SEQUENTIAL is not None:
+                # Ask the kernel for aggressive readahead so pages arrive in
+                # large batched reads instead of one fault at a time
+                mm.madvise(_MADV_SEQUENTIAL)
+            return _scan_bytes(mm, len(mm), regex, byte_regex, max_results)
+
+
+def _scratch_buffer(size: int) -> bytearray:
+    """Return this thread's reusable read buffer, grown to hold at least size bytes."""
+    buffer = getattr(_SCRATCH, "buffer", None)
+    if buffer is None or len(buffer) < size:
+        length = max(size, _SCRATCH_MIN, 2 * len(buffer) if buffer is not None else 0)
+        buffer = _SCRATCH.buffer = bytearray(min(length, _SCRATCH_SIZE))
+    return buffer
+
+
+def _scan_bytes(
+    data: Union[bytearray, mmap.mmap],
+    size: int,
+    regex: re.Pattern,
+    byte_regex: re.Pattern,
+    max_results: int,
+) -> List[Tuple[int, str]]:
+    """Return matching (line number, line) pairs from the first size bytes of data."""
+    matches = []
+    pos = counted = 0
+    line_no = 1
+    while pos < size and len(matches) < max_results:
+        match = byte_regex.search(data, pos, size)
+        if match is None:
+            break
+        
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        if start >= size:
+            break
+        end = data.find(b"\n", match.start(), size)
+        if end == -1:
+            end = size
+        
+        # mmap has no count(); each region is sliced only once
+        line_no += data[counted:start].count(b"\n")
+        counted = start
+        pos = end + 1
+        
+        # Confirm on the decoded line with the str regex; this drops
+        # candidates whose bytes match ran across a newline
+        line = data[start:end].decode("utf-8", errors="ignore")
+        if line.endswith("\r"):
+            line = line[:-1]
+        if regex.search(line):
+            matches.append((line_no, line))
+    
+    return matches
+
+
+def _python_search(
+    regex: re.Pattern,
+    search_path: Path,
+    include: Optional[str],
+    max_results: int,
+) -> List[str]:
+    """Search files with Python's re module."""
+    results = []
+    root = None if search_path.is_file() else str(search_path)
+    
+    # Simple ASCII patterns prefilter raw bytes so only candidate lines are decoded
+    byte_regex = None
+    if _bytes_prefilter_safe(regex):
+        byte_regex = _compile(regex.pattern.encode(), re.MULTILINE)
+    
+    def scan(file_path: str) -> List[str]:
+        try:
+            matches = _scan_file(file_path, regex, byte_regex, max_results)
+        except (UnicodeDecodeError, OSError, ValueError):
+            return []
+        rel_path = os.path.relpath(file_path, root) if root else os.path.basename(file_path)
+        return [f"{rel_path}:{i}: {line.strip()}" for i, line in matches]
+    
+    if root is None:
+        return scan(str(search_path))
+    
+    files = _iter_files(search_path, include)
+    
+    # Keep a bounded window of scans in flight and collect them in walk
+    # order, so output stays deterministic and we stop at max_results
+    pending = deque(
+        _GREP_EXECUTOR.submit(scan, file_path)
+        for file_path in itertools.islice(files, _GREP_WORKERS * 2)
+    )
+    try:
+        while pending and len(results) < max_results:
+            results.extend(pending.popleft().result())
+            for file_path in itertools.islice(files, 1):
+                pending.append(_GREP_EXECUTOR.submit(scan, file_path))
+    finally:
+        for future in pending:
+            future.cancel()
+    
+    return results[:max_results]
+
+
+def _grep_sync(
+    pattern: str,
+    path: str,
+    include: Optional[str] = None,
+    case_sensitive: bool = True,
+    max_results: int = 50,
+) -> ToolResult:
+    """Search for pattern in files."""
+    try:
+        search_path = Path(path).resolve()
+        
+        if not search_path.exists():
+            return ToolResult(success=False, output="", error=f"Path not found: {path}")
+        
+        flags = 0 if case_sensitive else re.IGNORECASE
+        
+        try:
+            regex = _compile(pattern, flags)
+        except re.error as e:
+            return ToolResult(success=False, output="", error=f"Invalid regex: {e}")
+        
+        # Prefer ripgrep; fall back to a Python scan if it's missing or fails
+        results = _rg_search(pattern, search_path, include, case_sensitive, max_results)
+        if results is None:
+            results = _python_search(regex, search_path, include, max_results)
+        
+        output = "\n".join(results) if results else f"No matches found for: {pattern}"
+        
+        return ToolResult(
+            success=True,
+            output=output,
+            metadata={"matches": len(results), "pattern": pattern}
+        )
+    
+    except Exception as e:
+        return ToolResult(success=False, output="", error=str(e))
+
+
 @tool(
     name="grep",
-    description="Search for a pattern in files. Returns matching lines with file paths and line numbers.",
+    description=(
+        "Search for a pattern in files. "
+        "Returns matching lines with file paths and line numbers."
+    ),
     category=ToolCategory.SEARCH,
     parameters=[
         ToolParameter(
@@ -60,54 +465,66 @@ async def grep(
     max_results: int = 50,
 ) -> ToolResult:
     """Search for pattern in files."""
+    return await asyncio.to_thread(_grep_sync, pattern, path, include, case_sensitive, max_results)
+
+
+def _find_files_sync(
+    path: str,
+    name: str,
+    type: str = "file",
+    max_results: int = 50,
+) -> ToolResult:
+    """Find files by name pattern."""
     try:
         search_path = Path(path).resolve()
         
         if not search_path.exists():
             return ToolResult(success=False, output="", error=f"Path not found: {path}")
         
-        flags = 0 if case_sensitive else re.IGNORECASE
+        if not search_path.is_dir():
+            return ToolResult(success=False, output="", error=f"Not a directory: {path}")
         
-        try:
-            regex = re.compile(pattern, flags)
-        except re.error as e:
-            return ToolResult(success=False, output="", error=f"Invalid regex: {e}")
+        if "/" not in name and not _GLOB_MAGIC_RE.search(name):
+            # Exact name: check directory listings by set membership and stop
+            # walking once enough matches are found
+            matches = []
+            for dir_path, dir_names, file_names in os.walk(search_path):
+                if (type != "file" and name in dir_names) or (type != "dir" and name in file_names):
+                    matches.append(Path(dir_path) / name)
+                    if len(matches) >= max_results:
+                        break
+        else:
+            matches = search_path.rglob(name)
         
+        # One stat per match gives both the type filter and the size; every
+        # match lives under search_path, so its relative path is a suffix
+        prefix_len = len(os.path.join(str(search_path), ""))
         results = []
-        
-        # Get files to search
-        if search_path.is_file():
-            files = [search_path]
-        else:
-            if include:
-                files = list(search_path.rglob(include))
+        for match in matches:
+            try:
+                st = os.stat(match)
+                mode, size = st.st_mode, st.st_size
+            except OSError:
+                mode = size = 0
+            is_file = stat.S_ISREG(mode)
+            if (type == "file" and not is_file) or (type == "dir" and not stat.S_ISDIR(mode)):
+                continue
+            
+            rel_path = str(match)[prefix_len:]
+            if is_file:
+                results.append(f"{rel_path} ({size} bytes)")
             else:
-                files = [f for f in search_path.rglob("*") if f.is_file()]
-        
-        for file_path in files:
+                results.append(f"{rel_path}/")
+            
             if len(results) >= max_results:
                 break
-            
-            try:
-                content = file_path.read_text(encoding="utf-8", errors="ignore")
-                
-                for i, line in enumerate(content.splitlines(), 1):
-                    if regex.search(line):
-                        rel_path = file_path.relative_to(search_path) if search_path.is_dir() else file_path.name
-                        results.append(f"{rel_path}:{i}: {line.strip()}")
-                        
-                        if len(results) >= max_results:
-                            break
-            
-            except (UnicodeDecodeError, PermissionError):
-                continue
         
-        output = "\n".join(results) if results else f"No matches found for: {pattern}"
+        output = "\n".join(results) if results else f"No matches found for: {name}"
         
         return ToolResult(
             success=True,
             output=output,
-            metadata={"matches": len(results), "pattern": pattern}
+            metadata={"matches": len(results), "pattern": name}
         )
     
     except Exception as e:
@@ -155,45 +572,7 @@ async def find_files(
     max_results: int = 50,
 ) -> ToolResult:
     """Find files by name pattern."""
-    try:
-        search_path = Path(path).resolve()
-        
-        if not search_path.exists():
-            return ToolResult(success=False, output="", error=f"Path not found: {path}")
-        
-        if not search_path.is_dir():
-            return ToolResult(success=False, output="", error=f"Not a directory: {path}")
-        
-        matches = list(search_path.rglob(name))
-        
-        # Filter by type
-        if type == "file":
-            matches = [m for m in matches if m.is_file()]
-        elif type == "dir":
-            matches = [m for m in matches if m.is_dir()]
-        
-        # Limit results
-        matches = matches[:max_results]
-        
-        results = []
-        for match in matches:
-            rel_path = match.relative_to(search_path)
-            size = match.stat().st_size if match.is_file() else None
-            if size is not None:
-                results.append(f"{rel_path} ({size} bytes)")
-            else:
-                results.append(f"{rel_path}/")
-        
-        output = "\n".join(results) if results else f"No matches found for: {name}"
-        
-        return ToolResult(
-            success=True,
-            output=output,
-            metadata={"matches": len(results), "pattern": name}
-        )
-    
-    except Exception as e:
-        return ToolResult(success=False, output="", error=str(e))
+    return await asyncio.to_thread(_find_files_sync, path, name, type, max_results)
 
 
 @tool(
@@ -219,44 +598,64 @@ async def find_files(
             description="File type filter (e.g., 'py', 'js')",
             required=False,
         ),
+        ToolParameter(
+            name="max_results",
+            type="integer",
+            description="Maximum number of result lines (default: 200)",
+            required=False,
+            default=200,
+        ),
     ],
 )
 async def ripgrep(
     pattern: str,
     path: str,
     file_type: Optional[str] = None,
+    max_results: int = 200,
 ) -> ToolResult:
     """Fast search using ripgrep."""
     try:
         search_path = Path(path).resolve()
         
         # Try ripgrep first
-        cmd = ["rg", "--line-number", "--no-heading", pattern, str(search_path)]
+        cmd = [
+            "rg", "--line-number", "--no-heading",
+            "--max-count", str(max_results),
+            "--max-filesize", "10M",
+            "--threads", str(os.cpu_count() or 1),
+            pattern, str(search_path),
+        ]
         
         if file_type:
             cmd.extend(["-t", file_type])
         
         try:
-            result = subprocess.run(
+            lines, truncated, _ = await asyncio.to_thread(
+                _stream_rg,
                 cmd,
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=str(search_path) if search_path.is_dir() else str(search_path.parent),
+                str(search_path) if search_path.is_dir() else str(search_path.parent),
+                max_results,
             )
             
-            output = result.stdout.strip() if result.stdout else "No matches found"
+            output = "\n".join(lines).strip() or "No matches found"
             
             return ToolResult(
                 success=True,
                 output=output,
-                metadata={"tool": "ripgrep"}
+                metadata={"tool": "ripgrep", "truncated": truncated}
             )
         
         except FileNotFoundError:
             # Fall back to Python grep
             include = f"*.{file_type}" if file_type else None
-            return await grep(pattern, path, include=include)
+            return await grep(pattern, path, include=include, max_results=max_results)
+        
+        except subprocess.TimeoutExpired:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"ripgrep timed out after {_RG_TIMEOUT}s",
+            )
     
     except Exception as e:
         return ToolResult(success=False, output="", error=str(e))